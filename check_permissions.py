@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 import os
+import glob
 import subprocess
 import grp
 import getpass
@@ -8,19 +9,34 @@ def check_permissions():
     """Check if the user has the necessary permissions to run the application."""
     print("🔍 Checking permissions...")
 
+    # Ask the kernel directly first; this needs no group/NSS lookups at all
+    candidate = next(glob.iglob('/dev/input/event*'), None)
+    if candidate and os.access(candidate, os.R_OK):
+        print(f"✅ Input devices are readable ({candidate}).")
+        print("✅ Permissions seem to be configured correctly.")
+        return True
+
+    user = getpass.getuser()
+    own_groups = set(os.getgroups())
+
     # Check for read access to /dev/input/event*
     try:
         # Check if user is in the 'input' group
         input_gid = grp.getgrnam('input').gr_gid
-        user_groups = os.getgrouplist(getpass.getuser(), os.getgid())
 
-        if input_gid in user_groups:
+        # The running process' supplementary groups are already resolved;
+        # only ask NSS for the full list if the group isn't active yet
+        in_group = input_gid in own_groups
+        if not in_group:
+            in_group = input_gid in os.getgrouplist(user, os.getgid())
+
+        if in_group:
             print("✅ User is in the 'input' group.")
         else:
             print("❌ User is not in the 'input' group.")
             print("   This is required for mouse detection to work.")
             print("   Please run the following command to add the user to the 'input' group:")
-            print(f"   sudo usermod -a -G input {getpass.getuser()}")
+            print(f"   sudo usermod -a -G input {user}")
             print("   You will need to log out and log back in for the changes to take effect.")
             return False
 
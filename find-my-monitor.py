@@ -6,6 +6,8 @@ Run this in your GUI session to find your monitor outputs
 import subprocess
 import tempfile
 import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
 
 def find_monitor_outputs():
     """Find available monitor outputs for grim"""
@@ -43,20 +45,39 @@ def find_monitor_outputs():
     print("\n🔍 Testing individual outputs...")
     working_outputs = []
     
-    for output in output_patterns:
+    # Probe every candidate in parallel; each grim call is dominated by
+    # process startup, so wall time becomes the slowest probe, not the sum
+    probe_dir = tempfile.mkdtemp(prefix='find-monitor-')
+    
+    def probe(output):
+        """Capture a single output, returning (output, size) or (output, None)"""
+        path = os.path.join(probe_dir, f"{output}.png")
         try:
-            with tempfile.NamedTemporaryFile(suffix='.png') as tmp:
-                result = subprocess.run(['grim', '-o', output, tmp.name], 
-                                      capture_output=True, text=True, timeout=3)
-                if result.returncode == 0:
-                    size = os.path.getsize(tmp.name)
-                    working_outputs.append((output, size))
-                    print(f"✅ {output} - Works ({size} bytes)")
-                
+            # Only the exit status matters here, so skip the output pipes
+            result = subprocess.run(['grim', '-o', output, path], 
+                                  stdout=subprocess.DEVNULL,
+                                  stderr=subprocess.DEVNULL, timeout=3)
+            if result.returncode == 0:
+                return output, os.path.getsize(path)
         except subprocess.TimeoutExpired:
-            print(f"⏱️  {output} - Timeout")
+            return output, 'timeout'
         except Exception as e:
             pass  # Silent fail for most
+        return output, None
+    
+    try:
+        with ThreadPoolExecutor(max_workers=len(output_patterns)) as executor:
+            results = list(executor.map(probe, output_patterns))
+    finally:
+        shutil.rmtree(probe_dir, ignore_errors=True)
+    
+    # Report in the original candidate order
+    for output, size in results:
+        if size == 'timeout':
+            print(f"⏱️  {output} - Timeout")
+        elif size is not None:
+            working_outputs.append((output, size))
+            print(f"✅ {output} - Works ({size} bytes)")
     
     print(f"\n📊 Summary:")
     print(f"Working outputs: {[out[0] for out in working_outputs]}")
@@ -4,9 +4,41 @@ Fix config file issues for Screenshot LLM Assistant
 """
 
 import os
-import json
+import tempfile
 from pathlib import Path
 
+# Prefer orjson for config parsing when it is installed
+try:
+    import orjson as _json
+    loads = _json.loads
+    def dumps(obj) -> bytes:
+        return _json.dumps(obj, option=_json.OPT_INDENT_2)
+except ImportError:
+    import json as _json
+    loads = _json.loads
+    def dumps(obj) -> bytes:
+        return _json.dumps(obj, indent=2).encode('utf-8')
+
+_HOME_SHARE = os.path.expanduser("~/.local/share/screenshot-llm")
+STATE_FILE = Path(os.path.expanduser("~/.cache/screenshot-llm/fix-config.state"))
+
+def _load_state() -> dict:
+    """Load the config mtimes recorded by the previous run"""
+    try:
+        with open(STATE_FILE, 'rb') as f:
+            return loads(f.read())
+    except (OSError, ValueError):
+        return {}
+
+def _save_state(state: dict):
+    """Persist config mtimes so unchanged files are skipped next time"""
+    try:
+        STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with open(STATE_FILE, 'wb') as f:
+            f.write(dumps(state))
+    except OSError as e:
+        print(f"⚠️  Could not save state to {STATE_FILE}: {e}")
+
 def main():
     print("🔧 Screenshot LLM Assistant - Config Fix Tool")
     print("=" * 50)
@@ -14,42 +46,76 @@ def main():
     # Check for config files in different locations
     config_locations = [
         "config/config.json",  # Current directory
-        "~/.local/share/screenshot-llm/config/config.json",  # User directory
-        os.path.expanduser("~/.local/share/screenshot-llm/config/config.json")
+        os.path.join(_HOME_SHARE, "config", "config.json"),  # User directory
     ]
     
+    # Collapse entries that resolve to the same file so each is checked once
+    seen = set()
+    candidates = []
+    for location in config_locations:
+        resolved = os.path.realpath(location)
+        if resolved not in seen:
+            seen.add(resolved)
+            candidates.append(resolved)
+    
     print("\n📁 Checking config file locations...")
     
-    for location in config_locations:
-        expanded_path = os.path.expanduser(location)
-        if os.path.exists(expanded_path):
-            print(f"✅ Found: {expanded_path}")
-            
-            # Check if it has the old API key
-            try:
-                with open(expanded_path, 'r') as f:
-                    config = json.load(f)
-                    
-                api_key = config.get('llm', {}).get('api_key', '')
-                if api_key and api_key.endswith('S_8A'):
-                    print(f"⚠️  Contains old API key ending in 'S_8A'")
-                    
-                    # Ask if user wants to clear it
-                    response = input(f"Clear old API key from {expanded_path}? (y/n): ")
-                    if response.lower() == 'y':
-                        config['llm']['api_key'] = ''
-                        with open(expanded_path, 'w') as f:
-                            json.dump(config, f, indent=2)
-                        print(f"✅ Cleared API key from {expanded_path}")
-                elif api_key:
+    # mtimes of configs already checked clean on a previous run
+    state = _load_state()
+    new_state = {}
+    
+    for loc in candidates:
+        path = Path(loc)
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            print(f"❌ Not found: {path}")
+            continue
+        
+        print(f"✅ Found: {path}")
+        
+        if state.get(str(path)) == st.st_mtime_ns:
+            print("⏭️  Unchanged since last check, no old API key")
+            new_state[str(path)] = st.st_mtime_ns
+            continue
+        
+        # Check if it has the old API key
+        try:
+            with open(path, 'rb') as f:
+                config = loads(f.read())
+                
+            api_key = config.get('llm', {}).get('api_key', '')
+            if api_key and api_key.endswith('S_8A'):
+                print(f"⚠️  Contains old API key ending in 'S_8A'")
+                
+                # Ask if user wants to clear it
+                response = input(f"Clear old API key from {path}? (y/n): ")
+                if response.lower() == 'y':
+                    config['llm']['api_key'] = ''
+                    # Write beside the original and rename over it so a
+                    # crash can never leave a truncated config behind
+                    tmp_fd, tmp_path = tempfile.mkstemp(dir=path.parent,
+                                                        prefix='.config.', suffix='.json')
+                    try:
+                        os.fchmod(tmp_fd, st.st_mode & 0o777)
+                        with os.fdopen(tmp_fd, 'wb') as f:
+                            f.write(dumps(config))
+                        os.replace(tmp_path, path)
+                    except BaseException:
+                        os.unlink(tmp_path)
+                        raise
+                    print(f"✅ Cleared API key from {path}")
+            else:
+                if api_key:
                     print(f"🔑 Has API key: {api_key[:8]}...{api_key[-4:]}")
                 else:
                     print(f"📝 API key is empty (will read from environment)")
-                    
-            except Exception as e:
-                print(f"❌ Error reading {expanded_path}: {e}")
-        else:
-            print(f"❌ Not found: {expanded_path}")
+                new_state[str(path)] = st.st_mtime_ns
+                
+        except Exception as e:
+            print(f"❌ Error reading {path}: {e}")
+    
+    _save_state(new_state)
     
     # Check environment variables
     print("\n🌍 Checking environment variables...")
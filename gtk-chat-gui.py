@@ -9,53 +9,106 @@ from Tkinter to GTK as outlined in claude.md.
 
 import sys
 import os
-import json
 import logging
+import logging.handlers
+import mmap
+import pickle
+import tempfile
 from pathlib import Path
 
+# Prefer orjson for config parsing when it is installed
+try:
+    from orjson import loads
+except ImportError:
+    from json import loads
+
 # Add lib directory to path
 lib_path = Path(__file__).parent / 'lib'
 sys.path.insert(0, str(lib_path))
 
-import gi
-gi.require_version('Gtk', '3.0')
-from gi.repository import Gtk
+# Resolved once; expanduser consults $HOME/passwd on every call
+_HOME_SHARE = os.path.expanduser("~/.local/share/screenshot-llm")
+
+def _config_signature(stat: os.stat_result) -> tuple:
+    """Identify a config.json version by its exact mtime and size"""
+    return (stat.st_mtime_ns, stat.st_size)
+
+def _read_config_cache(config_path: str, cache_path: str):
+    """Return the cached config snapshot if it was taken from this exact JSON"""
+    try:
+        signature = _config_signature(os.stat(config_path))
+        with open(cache_path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, prot=mmap.PROT_READ) as mm:
+                snapshot = pickle.loads(mm)
+    except (OSError, ValueError, EOFError, pickle.UnpicklingError):
+        return None
+    
+    # A cache from an older format, or from a different version of the JSON,
+    # is simply a miss
+    if not (isinstance(snapshot, tuple) and len(snapshot) == 2):
+        return None
+    cached_signature, config = snapshot
+    return config if cached_signature == signature else None
+
+def _write_config_cache(cache_path: str, signature: tuple, config: dict):
+    """Atomically write a binary snapshot of the parsed config"""
+    try:
+        with tempfile.NamedTemporaryFile(dir=os.path.dirname(cache_path),
+                                         prefix='.config.', delete=False) as tmp:
+            pickle.dump((signature, config), tmp, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp.name, cache_path)
+    except OSError as e:
+        print(f"Could not write config cache: {e}")
 
-def load_config(config_dir: str = "~/.local/share/screenshot-llm") -> dict:
+def load_config(config_dir: str = _HOME_SHARE) -> dict:
     """Load configuration from file"""
     config_dir = os.path.expanduser(config_dir)
     config_path = os.path.join(config_dir, "config", "config.json")
+    cache_path = config_path + '.cache'
+    
+    # Fast path: reuse the binary snapshot from a previous launch
+    config = _read_config_cache(config_path, cache_path)
+    if config is not None:
+        print(f"Loaded configuration from: {config_path}")
+        return config
     
     try:
-        with open(config_path, 'r') as f:
-            config = json.load(f)
+        with open(config_path, 'rb') as f:
+            # Signature of the bytes actually parsed, not of a later edit
+            signature = _config_signature(os.fstat(f.fileno()))
+            config = loads(f.read())
             print(f"Loaded configuration from: {config_path}")
-            return config
+        _write_config_cache(cache_path, signature, config)
+        return config
     except FileNotFoundError:
         print(f"Config file not found: {config_path}")
         print("Using default configuration")
         return {}
-    except json.JSONDecodeError as e:
+    except ValueError as e:
         print(f"Invalid JSON in config file: {e}")
         print("Using default configuration")
         return {}
 
 def setup_logging(config: dict):
     """Setup logging configuration"""
-    config_dir = os.path.expanduser("~/.local/share/screenshot-llm")
-    log_dir = os.path.join(config_dir, 'logs')
+    log_dir = f"{_HOME_SHARE}/logs"
     os.makedirs(log_dir, exist_ok=True)
     
     log_file = os.path.join(log_dir, 'gtk-chat-gui.log')
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    
+    # Batch file writes; errors and interpreter shutdown still flush promptly
+    file_handler = logging.FileHandler(log_file)
+    file_handler.setFormatter(formatter)
+    handlers = [logging.handlers.MemoryHandler(capacity=100, target=file_handler)]
+    
+    # Only echo to stdout when someone is actually watching the terminal
+    if sys.stdout.isatty():
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setFormatter(formatter)
+        handlers.append(console_handler)
     
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(log_file),
-            logging.StreamHandler(sys.stdout)
-        ]
-    )
+    logging.basicConfig(level=logging.INFO, handlers=handlers)
 
 def main():
     """Main entry point for GTK chat GUI"""
@@ -63,7 +116,7 @@ def main():
     
     # Parse command line arguments
     parser = argparse.ArgumentParser(description="Screenshot LLM Assistant - GTK Chat GUI")
-    parser.add_argument('--config-dir', default="~/.local/share/screenshot-llm",
+    parser.add_argument('--config-dir', default=_HOME_SHARE,
                        help='Configuration directory')
     parser.add_argument('--minimized', action='store_true',
                        help='Start minimized (not implemented yet)')
@@ -82,11 +135,15 @@ def main():
     logger.info("Starting Screenshot LLM Assistant GTK GUI")
     
     try:
-        # Import and create GTK window
+        # Import and create GTK window; deferred so --help and config
+        # errors don't pay for loading GObject introspection
         try:
+            import gi
+            gi.require_version('Gtk', '3.0')
+            from gi.repository import Gtk
             from gtk_chat_window import GTKChatWindow
             logger.info("Successfully imported GTKChatWindow")
-        except ImportError as e:
+        except (ImportError, ValueError) as e:
             logger.error(f"Failed to import GTKChatWindow: {e}")
             return 1
         
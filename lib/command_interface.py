@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 import os
 import re
+from functools import lru_cache
 import subprocess
 import threading
 import logging
@@ -8,12 +9,34 @@ from typing import List, Optional
 import gi
 gi.require_version('Gtk', '4.0')
 from gi.repository import Gtk, GLib, Pango
-from pygments import highlight
-from pygments.lexers import get_lexer_by_name, guess_lexer
-from pygments.formatters import TerminalFormatter
+from pygments.lexers import guess_lexer
+
+try:
+    import pyclip
+except ImportError:
+    pyclip = None
 
 logger = logging.getLogger(__name__)
 
+# Command extraction patterns, compiled once at import
+_CODE_BLOCK_RE = re.compile(r'```(\w+)?\n(.*?)\n```', re.DOTALL)
+_INLINE_CODE_RE = re.compile(r'`([^`]+)`')
+
+# Any of these makes a command unsafe to run automatically; one alternation
+# instead of a search per pattern
+_DANGEROUS_COMMAND_RE = re.compile('|'.join([
+    r'\brm\s+', r'\bmv\s+.*\s+/', r'\bcp\s+.*\s+/',
+    r'\bsudo\b', r'\bsu\b', r'\bchmod\b', r'\bchown\b',
+    r'\bdd\b', r'\bmkfs\b', r'\bformat\b',
+    r'>\s*/', r'\|.*>', r'curl.*\|\s*sh', r'wget.*\|\s*sh'
+]), re.IGNORECASE)
+
+@lru_cache(maxsize=128)
+def _guess_lexer_name(code: str) -> str:
+    """Name of the Pygments lexer that best matches code, memoized per snippet"""
+    # guess_lexer scores the text against every registered lexer
+    return guess_lexer(code).name.lower()
+
 class CommandInterface:
     def __init__(self):
         self.app = None
@@ -26,8 +49,7 @@ class CommandInterface:
         commands = []
         
         # Find code blocks
-        code_block_pattern = r'```(\w+)?\n(.*?)\n```'
-        matches = re.findall(code_block_pattern, llm_response, re.DOTALL)
+        matches = _CODE_BLOCK_RE.findall(llm_response)
         
         for lang, code in matches:
             if not lang:
@@ -40,8 +62,7 @@ class CommandInterface:
             })
         
         # Find inline code
-        inline_pattern = r'`([^`]+)`'
-        inline_matches = re.findall(inline_pattern, llm_response)
+        inline_matches = _INLINE_CODE_RE.findall(llm_response)
         
         for code in inline_matches:
             if len(code.split()) <= 5 and any(cmd in code for cmd in ['cd', 'ls', 'git', 'npm', 'python']):
@@ -56,8 +77,7 @@ class CommandInterface:
     def _guess_language(self, code: str) -> str:
         """Guess programming language from code"""
         try:
-            lexer = guess_lexer(code)
-            return lexer.name.lower()
+            return _guess_lexer_name(code)
         except:
             # Fallback heuristics
             if any(word in code for word in ['sudo', 'apt', 'cd', 'ls', 'grep']):
@@ -190,8 +210,12 @@ class CommandInterface:
     def _copy_command(self, command: str):
         """Copy command to clipboard"""
         try:
+            # The pop-up is short-lived, so hand the text to the system
+            # clipboard rather than owning the selection in-process
+            if pyclip is not None:
+                pyclip.copy(command)
             # Use wl-copy for Wayland or xclip for X11
-            if os.environ.get('WAYLAND_DISPLAY'):
+            elif os.environ.get('WAYLAND_DISPLAY'):
                 subprocess.run(['wl-copy'], input=command.encode(), timeout=5)
             else:
                 subprocess.run(['xclip', '-selection', 'clipboard'], input=command.encode(), timeout=5)
@@ -264,18 +288,7 @@ class CommandInterface:
     
     def _is_safe_command(self, command: str) -> bool:
         """Check if command is safe to execute automatically"""
-        dangerous_patterns = [
-            r'\brm\s+', r'\bmv\s+.*\s+/', r'\bcp\s+.*\s+/',
-            r'\bsudo\b', r'\bsu\b', r'\bchmod\b', r'\bchown\b',
-            r'\bdd\b', r'\bmkfs\b', r'\bformat\b',
-            r'>\s*/', r'\|.*>', r'curl.*\|\s*sh', r'wget.*\|\s*sh'
-        ]
-        
-        for pattern in dangerous_patterns:
-            if re.search(pattern, command, re.IGNORECASE):
-                return False
-        
-        return True
+        return _DANGEROUS_COMMAND_RE.search(command) is None
 
 def show_response_gui(llm_response: str):
     """Convenience function to show LLM response"""
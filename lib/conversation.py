@@ -8,12 +8,21 @@ Handles conversation history, message formatting, and persistence.
 import json
 import os
 import logging
+import threading
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+# Seconds to wait after the last message before auto-saving, so a burst of
+# messages is written to disk once
+AUTO_SAVE_DELAY = 0.5
+
+# Cache of per-file listing summaries kept alongside the saved conversations;
+# not a .json file so it is never mistaken for a conversation
+CONVERSATION_INDEX = ".conversation-index"
+
 class ConversationManager:
     def __init__(self, config_dir: str = "~/.local/share/screenshot-llm", config: Dict = None):
         self.config_dir = os.path.expanduser(config_dir)
@@ -28,12 +37,24 @@ class ConversationManager:
         conv_config = config.get("conversation", {}) if config else {}
         self.max_api_messages = conv_config.get("max_api_messages", 10)
         
+        # Pending debounced auto-save; the lock is held from claiming the
+        # timer through writing the file, so a flush waits for a save in
+        # progress. Reentrant because saving may start a new conversation.
+        self._save_timer: Optional[threading.Timer] = None
+        self._save_lock = threading.RLock()
+        # Guards messages/current_context against the auto-save timer thread
+        self._data_lock = threading.Lock()
+        
     def create_new_conversation(self) -> str:
         """Create a new conversation with unique ID"""
+        # Write out the old conversation before its state is replaced
+        self.flush_auto_save()
+        
         timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-        self.conversation_id = f"conversation_{timestamp}"
-        self.messages.clear()
-        self.current_context.clear()
+        with self._data_lock:
+            self.conversation_id = f"conversation_{timestamp}"
+            self.messages.clear()
+            self.current_context.clear()
         
         logger.info(f"Created new conversation: {self.conversation_id}")
         return self.conversation_id
@@ -48,8 +69,9 @@ class ConversationManager:
             "context": context
         }
         
-        self.messages.append(message)
-        self.current_context.update(context)
+        with self._data_lock:
+            self.messages.append(message)
+            self.current_context.update(context)
         
         # Auto-save conversation
         self._auto_save()
@@ -66,7 +88,8 @@ class ConversationManager:
             "context": self.current_context.copy()
         }
         
-        self.messages.append(message)
+        with self._data_lock:
+            self.messages.append(message)
         
         # Auto-save conversation
         self._auto_save()
@@ -83,7 +106,8 @@ class ConversationManager:
             "context": self.current_context.copy()
         }
         
-        self.messages.append(message)
+        with self._data_lock:
+            self.messages.append(message)
         
         # Auto-save conversation
         self._auto_save()
@@ -151,30 +175,38 @@ class ConversationManager:
     
     def save_conversation(self, conversation_id: Optional[str] = None) -> str:
         """Save conversation to disk"""
-        if not conversation_id:
-            conversation_id = self.conversation_id or self.create_new_conversation()
-        
-        conversation_data = {
-            "id": conversation_id,
-            "created": datetime.now().isoformat(),
-            "messages": self.messages,
-            "context": self.current_context
-        }
-        
-        filepath = os.path.join(self.conversations_dir, f"{conversation_id}.json")
-        
-        try:
-            with open(filepath, 'w') as f:
-                json.dump(conversation_data, f, indent=2)
+        with self._save_lock:
+            if not (conversation_id or self.conversation_id):
+                self.create_new_conversation()
             
-            logger.info(f"Saved conversation to: {filepath}")
-            return filepath
-        except Exception as e:
-            logger.error(f"Failed to save conversation: {e}")
-            raise
+            # Snapshot the ID and data together under the lock; the auto-save
+            # timer serializes on its own thread while the UI keeps appending
+            with self._data_lock:
+                conversation_id = conversation_id or self.conversation_id
+                conversation_data = {
+                    "id": conversation_id,
+                    "created": datetime.now().isoformat(),
+                    "messages": list(self.messages),
+                    "context": dict(self.current_context)
+                }
+            
+            filepath = os.path.join(self.conversations_dir, f"{conversation_id}.json")
+            
+            try:
+                with open(filepath, 'w') as f:
+                    json.dump(conversation_data, f, indent=2)
+                
+                logger.info(f"Saved conversation to: {filepath}")
+                return filepath
+            except Exception as e:
+                logger.error(f"Failed to save conversation: {e}")
+                raise
     
     def load_conversation(self, conversation_id: str) -> bool:
         """Load conversation from disk"""
+        # Write out the current conversation before it is replaced
+        self.flush_auto_save()
+        
         filepath = os.path.join(self.conversations_dir, f"{conversation_id}.json")
         
         if not os.path.exists(filepath):
@@ -185,9 +217,10 @@ class ConversationManager:
             with open(filepath, 'r') as f:
                 conversation_data = json.load(f)
             
-            self.conversation_id = conversation_data["id"]
-            self.messages = conversation_data.get("messages", [])
-            self.current_context = conversation_data.get("context", {})
+            with self._data_lock:
+                self.conversation_id = conversation_data["id"]
+                self.messages = conversation_data.get("messages", [])
+                self.current_context = conversation_data.get("context", {})
             
             logger.info(f"Loaded conversation: {conversation_id}")
             return True
@@ -199,42 +232,108 @@ class ConversationManager:
         """List all saved conversations"""
         conversations = []
         
+        # Summaries from the last listing, reused for files whose mtime hasn't
+        # changed so only new or updated conversations are parsed again
+        index = self._load_index()
+        fresh_index = {}
+        
         try:
-            for filename in os.listdir(self.conversations_dir):
-                if filename.endswith('.json'):
-                    filepath = os.path.join(self.conversations_dir, filename)
+            with os.scandir(self.conversations_dir) as entries:
+                for entry in entries:
+                    if not entry.name.endswith('.json'):
+                        continue
+                    
+                    # A file deleted mid-scan shouldn't abort the listing
                     try:
-                        with open(filepath, 'r') as f:
-                            data = json.load(f)
-                        
-                        # Get conversation summary
-                        message_count = len(data.get("messages", []))
-                        last_message_time = None
-                        
-                        if data.get("messages"):
-                            last_message_time = data["messages"][-1].get("timestamp")
-                        
-                        conversations.append({
-                            "id": data["id"],
-                            "created": data.get("created"),
-                            "last_activity": last_message_time,
-                            "message_count": message_count,
-                            "filepath": filepath
-                        })
-                    except Exception as e:
-                        logger.warning(f"Could not read conversation file {filename}: {e}")
+                        mtime_ns = entry.stat().st_mtime_ns
+                    except OSError as e:
+                        logger.warning(f"Could not stat conversation file {entry.name}: {e}")
+                        continue
+                    
+                    cached = index.get(entry.name)
+                    if cached and cached.get("mtime_ns") == mtime_ns:
+                        summary = cached["summary"]
+                    else:
+                        try:
+                            summary = self._summarize_conversation_file(entry.path)
+                        except Exception as e:
+                            logger.warning(f"Could not read conversation file {entry.name}: {e}")
+                            continue
+                    
+                    fresh_index[entry.name] = {"mtime_ns": mtime_ns, "summary": summary}
+                    conversations.append(summary)
+            
+            if fresh_index != index:
+                self._save_index(fresh_index)
             
             # Sort by last activity (most recent first)
-            conversations.sort(key=lambda x: x.get("last_activity", ""), reverse=True)
+            conversations.sort(key=lambda x: x.get("last_activity") or "", reverse=True)
             
         except Exception as e:
             logger.error(f"Failed to list conversations: {e}")
         
         return conversations
     
+    def _summarize_conversation_file(self, filepath: str) -> Dict[str, Any]:
+        """Read the listing summary for one saved conversation"""
+        with open(filepath, 'r') as f:
+            data = json.load(f)
+        
+        # Get conversation summary
+        message_count = len(data.get("messages", []))
+        last_message_time = None
+        
+        if data.get("messages"):
+            last_message_time = data["messages"][-1].get("timestamp")
+        
+        return {
+            "id": data["id"],
+            "created": data.get("created"),
+            "last_activity": last_message_time,
+            "message_count": message_count,
+            "filepath": filepath
+        }
+    
+    def _load_index(self) -> Dict[str, Any]:
+        """Load the cached conversation summaries, or an empty index"""
+        try:
+            with open(os.path.join(self.conversations_dir, CONVERSATION_INDEX), 'r') as f:
+                index = json.load(f)
+            return index if isinstance(index, dict) else {}
+        except (OSError, ValueError):
+            return {}
+    
+    def _save_index(self, index: Dict[str, Any]):
+        """Write the conversation summary cache atomically"""
+        index_path = os.path.join(self.conversations_dir, CONVERSATION_INDEX)
+        tmp_path = f"{index_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(index, f)
+            os.replace(tmp_path, index_path)
+        except OSError as e:
+            logger.debug(f"Could not write conversation index: {e}")
+    
     def _auto_save(self):
-        """Auto-save conversation after each message"""
-        if self.conversation_id and self.messages:
+        """Schedule an auto-save, restarting the delay on each new message"""
+        if not (self.conversation_id and self.messages):
+            return
+        
+        with self._save_lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+            self._save_timer = threading.Timer(AUTO_SAVE_DELAY, self.flush_auto_save)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+    
+    def flush_auto_save(self):
+        """Write a pending auto-save now, if there is one"""
+        with self._save_lock:
+            timer, self._save_timer = self._save_timer, None
+            if timer is None:
+                return
+            
+            timer.cancel()
             try:
                 self.save_conversation()
             except Exception as e:
@@ -258,9 +357,11 @@ class ConversationManager:
     
     def clear_conversation(self):
         """Clear current conversation"""
-        self.messages.clear()
-        self.current_context.clear()
-        self.conversation_id = None
+        self.flush_auto_save()
+        with self._data_lock:
+            self.messages.clear()
+            self.current_context.clear()
+            self.conversation_id = None
         logger.info("Conversation cleared")
 
 if __name__ == "__main__":
@@ -15,13 +15,21 @@ import sys
 import os
 import threading
 import asyncio
+import atexit
 import json
-from typing import Optional, List, Dict, Any
-from PIL import Image
-import io
+from typing import Optional, List, Dict, Any, Tuple, Callable
 import subprocess
 import re
-from datetime import datetime
+import hashlib
+import mmap
+from collections import OrderedDict, deque
+from functools import lru_cache
+import time
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
 
 # Add lib directory to path for imports
 lib_path = os.path.dirname(os.path.abspath(__file__))
@@ -48,14 +56,19 @@ except ImportError as e:
         def add_user_message(self, msg): pass
         def add_assistant_message(self, msg): pass
         def get_messages_for_api(self): return []
+        def flush_auto_save(self): pass
 
 try:
-    from llm_client import LLMClient
+    from llm_client import LLMClient, create_http_client
 except ImportError as e:
     logger.warning(f"LLMClient import failed: {e}")
     class LLMClient:
-        def __init__(self, config): pass
+        def __init__(self, config, http_client=None): pass
         async def send_screenshot(self, path, prompt): return "Mock response"
+        async def stream_screenshot(self, path, prompt, image_bytes=None, mime_type=None):
+            yield "Mock response"
+    def create_http_client():
+        return None
 
 try:
     from ipc_handler import IPCManager
@@ -117,19 +130,185 @@ try:
 except NameError:
     logger = logging.getLogger(__name__)
 
+# Maximum number of LLM responses kept in the in-memory cache
+RESPONSE_CACHE_SIZE = 512
+
+# How often streamed reply chunks are flushed into the chat bubble
+STREAM_FLUSH_MS = 50
+
+# Upper bound on LLM requests in flight at once on the shared loop
+MAX_CONCURRENT_LLM_CALLS = 4
+
+# Code blocks at most this wide (and short enough) are embedded without a
+# ScrolledWindow
+CODE_INLINE_MAX_COLUMNS = 80
+
+# Bubble header timestamp format
+TIMESTAMP_FORMAT = "%H:%M"
+
+# Markdown patterns, compiled once instead of on every message
+_CODE_BLOCK_RE = re.compile(r'(```[\w]*\n.*?\n```)', re.DOTALL)
+_INLINE_MD_RE = re.compile(
+    r'^# (?P<h1>.+)$'
+    r'|^## (?P<h2>.+)$'
+    r'|^- (?P<li>.+)$'
+    r'|`(?P<code>[^`]+)`'
+    r'|\*\*(?P<bold>[^*]+)\*\*'
+    r'|\*(?P<italic>[^*]+)\*',
+    re.MULTILINE
+)
+_INLINE_MD_MARKUP = {
+    'h1': '<big><b>{}</b></big>',
+    'h2': '<b>{}</b>',
+    'li': '  • {}',
+    'code': '<tt>{}</tt>',
+    'bold': '<b>{}</b>',
+    'italic': '<i>{}</i>',
+}
+
+def _render_inline_markdown(match) -> str:
+    """Render a single _INLINE_MD_RE match as Pango markup"""
+    kind = match.lastgroup
+    inner = match.group(kind)
+    if kind != 'code':
+        # Headers, list items and emphasis may contain further formatting
+        inner = _markdown_to_pango(inner)
+    return _INLINE_MD_MARKUP[kind].format(inner)
+
+def _markdown_to_pango(text: str) -> str:
+    """Convert basic inline markdown to Pango markup in a single scan"""
+    # Every _INLINE_MD_RE alternative needs one of these characters; plain
+    # prose skips the regex entirely
+    if '*' not in text and '`' not in text and '#' not in text and '- ' not in text:
+        return text
+    return _INLINE_MD_RE.sub(_render_inline_markdown, text)
+
+def _render_markdown(text: str) -> List[Tuple[bool, str, Optional[str]]]:
+    """Split a reply into (is_code, source, pango_markup) segments.
+    
+    Pure string work with no GTK calls, so it can run off the UI thread.
+    """
+    if '```' not in text:
+        # No fences: skip the DOTALL split
+        return [(False, text, _markdown_to_pango(text))] if text.strip() else []
+    
+    segments = []
+    # The capturing split puts every fenced block at an odd index, so
+    # fences never need re-checking
+    for index, part in enumerate(_CODE_BLOCK_RE.split(text)):
+        if index % 2:
+            segments.append((True, part, None))
+        elif part.strip():
+            segments.append((False, part, _markdown_to_pango(part)))
+    return segments
+
+@lru_cache(maxsize=32)
+def _context_prompt(app_name: Optional[str], window_title: Optional[str],
+                    working_directory: Optional[str]) -> str:
+    """Build the context prompt, memoized since consecutive screenshots
+    usually come from the same window"""
+    parts = ["I'm currently working with:"]
+    
+    if app_name:
+        parts.append(f"- Application: {app_name}")
+    
+    if window_title:
+        parts.append(f"- Window: {window_title}")
+    
+    if working_directory:
+        parts.append(f"- Directory: {working_directory}")
+    
+    return "\n".join(parts)
+
+CHAT_CSS = """
+    /* GTK Chat Window Styles */
+    .code-block {
+        background-color: #1e1e1e;
+        border: 1px solid #48b9c7;
+        border-radius: 4px;
+    }
+    
+    .code-header {
+        background-color: #333333;
+        border-bottom: 1px solid #555555;
+    }
+    
+    .code-content {
+        background-color: #1e1e1e;
+        color: #f8f8f2;
+        font-family: "SF Mono", "Consolas", monospace;
+        font-size: 10px;
+    }
+    
+    .copy-button {
+        background: linear-gradient(135deg, #48b9c7, #5cc7d5);
+        color: #ffffff;
+        border: none;
+        border-radius: 4px;
+        padding: 4px 8px;
+        font-size: 9px;
+    }
+    
+    .copy-button:hover {
+        background: linear-gradient(135deg, #5cc7d5, #6dd0de);
+    }
+    
+    .message-text {
+        background-color: transparent;
+        color: #ffffff;
+        font-family: "SF Pro Display", sans-serif;
+        font-size: 11px;
+    }
+    
+    .input-area {
+        background-color: #3c3c3c;
+        border-top: 1px solid #48b9c7;
+    }
+    
+    .input-text {
+        background-color: #2d2d2d;
+        color: #ffffff;
+        font-family: "SF Pro Display", sans-serif;
+        font-size: 11px;
+    }
+    
+    .send-button {
+        background: linear-gradient(135deg, #48b9c7, #5cc7d5);
+        color: #ffffff;
+        border: none;
+        border-radius: 4px;
+        padding: 8px 16px;
+    }
+    
+    .send-button:hover {
+        background: linear-gradient(135deg, #5cc7d5, #6dd0de);
+    }
+    
+    .timestamp {
+        color: #b0b0b0;
+        font-size: 9px;
+    }
+"""
+
+# Installed on the default screen by the first GTKChatWindow
+_style_provider = None
+
 class MessageBubble(Gtk.Box):
     """
     Custom GTK widget for displaying individual chat messages.
     Much cleaner than tkinter's text widget approach.
     """
     
-    def __init__(self, sender: str, content: str, role: str, timestamp: str = None, config: Dict = None):
+    def __init__(self, sender: str, content: str, role: str, timestamp: str = None, config: Dict = None,
+                 rendered: Optional[List[Tuple[bool, str, Optional[str]]]] = None):
         super().__init__(orientation=Gtk.Orientation.VERTICAL, spacing=0)
         
         self.sender = sender
         self.content = content
+        # Markdown segments already rendered off the UI thread, if any
+        self._rendered = rendered
         self.role = role
-        self.timestamp = timestamp or datetime.now().strftime("%H:%M")
+        self.timestamp = timestamp or time.strftime(TIMESTAMP_FORMAT)
         self.config = config or {}
         
         # Get theme colors
@@ -139,6 +318,9 @@ class MessageBubble(Gtk.Box):
         self.text_color = "#ffffff"
         self.text_secondary = "#b0b0b0"
         
+        # Plain-text buffer that streamed reply chunks are appended to
+        self._stream_buffer = None
+        
         self._create_bubble()
         self._apply_styles()
     
@@ -193,7 +375,7 @@ class MessageBubble(Gtk.Box):
         """Parse and display message content with markdown support"""
         # Simple markdown parsing for GTK
         if self.role == "assistant":
-            self._parse_markdown_content(self.content)
+            self._parse_markdown_content(self.content, self._rendered)
         else:
             # Simple text for user messages
             label = Gtk.Label(label=self.content)
@@ -203,18 +385,18 @@ class MessageBubble(Gtk.Box):
             label.set_selectable(True)
             self.content_area.pack_start(label, False, False, 0)
     
-    def _parse_markdown_content(self, text: str):
+    def _parse_markdown_content(self, text: str, rendered=None):
         """Parse markdown content and create appropriate GTK widgets"""
-        # Split by code blocks first
-        parts = re.split(r'(```[\w]*\n.*?\n```)', text, flags=re.DOTALL)
+        if rendered is None:
+            rendered = _render_markdown(text)
         
-        for part in parts:
-            if part.startswith('```') and part.endswith('```'):
-                # Code block
+        for is_code, part, markup in rendered:
+            if is_code:
+                # Code block, rendered verbatim
                 self._create_code_block(part)
             else:
                 # Regular markdown text
-                self._create_text_content(part)
+                self._create_text_content(part, markup)
     
     def _create_code_block(self, code_block: str):
         """Create a modern code block widget"""
@@ -258,10 +440,6 @@ class MessageBubble(Gtk.Box):
         code_box.pack_start(header_box, False, False, 0)
         
         # Code content
-        code_scroll = Gtk.ScrolledWindow()
-        code_scroll.set_policy(Gtk.PolicyType.AUTOMATIC, Gtk.PolicyType.AUTOMATIC)
-        code_scroll.set_size_request(-1, min(200, max(50, code_content.count('\n') * 20 + 40)))
-        
         code_text = Gtk.TextView()
         code_text.set_editable(False)
         code_text.set_cursor_visible(False)
@@ -270,13 +448,22 @@ class MessageBubble(Gtk.Box):
         buffer = code_text.get_buffer()
         buffer.set_text(code_content)
         
-        code_scroll.add(code_text)
-        code_box.pack_start(code_scroll, True, True, 0)
+        height = code_content.count('\n') * 20 + 40
+        if height > 200 or max(map(len, lines[1:-1])) > CODE_INLINE_MAX_COLUMNS:
+            # Only blocks that can overflow need their own scroller
+            code_scroll = Gtk.ScrolledWindow()
+            code_scroll.set_policy(Gtk.PolicyType.AUTOMATIC, Gtk.PolicyType.AUTOMATIC)
+            code_scroll.set_size_request(-1, min(200, max(50, height)))
+            code_scroll.add(code_text)
+            code_box.pack_start(code_scroll, True, True, 0)
+        else:
+            code_text.set_size_request(-1, max(50, height))
+            code_box.pack_start(code_text, True, True, 0)
         
         code_frame.add(code_box)
         self.content_area.pack_start(code_frame, False, False, 4)
     
-    def _create_text_content(self, text: str):
+    def _create_text_content(self, text: str, markup: Optional[str] = None):
         """Create text content with basic markdown formatting"""
         if not text.strip():
             return
@@ -290,22 +477,8 @@ class MessageBubble(Gtk.Box):
         
         buffer = text_view.get_buffer()
         
-        # Basic markdown parsing
-        formatted_text = text
-        
-        # Handle headers
-        formatted_text = re.sub(r'^# (.+)$', r'<big><b>\1</b></big>', formatted_text, flags=re.MULTILINE)
-        formatted_text = re.sub(r'^## (.+)$', r'<b>\1</b>', formatted_text, flags=re.MULTILINE)
-        
-        # Handle bold and italic
-        formatted_text = re.sub(r'\*\*([^*]+)\*\*', r'<b>\1</b>', formatted_text)
-        formatted_text = re.sub(r'\*([^*]+)\*', r'<i>\1</i>', formatted_text)
-        
-        # Handle inline code
-        formatted_text = re.sub(r'`([^`]+)`', r'<tt>\1</tt>', formatted_text)
-        
-        # Handle lists
-        formatted_text = re.sub(r'^- (.+)$', r'  • \1', formatted_text, flags=re.MULTILINE)
+        # Basic markdown parsing (headers, emphasis, inline code, lists)
+        formatted_text = markup if markup is not None else _markdown_to_pango(text)
         
         try:
             buffer.insert_markup(buffer.get_end_iter(), formatted_text, -1)
@@ -314,11 +487,36 @@ class MessageBubble(Gtk.Box):
             buffer.set_text(text)
         
         # Adjust height based on content
-        lines = len(text.split('\n'))
+        lines = text.count('\n') + 1
         text_view.set_size_request(-1, min(300, max(60, lines * 25)))
         
         self.content_area.pack_start(text_view, False, False, 0)
     
+    def append_text(self, text: str):
+        """Append streamed plain text while a reply is still arriving"""
+        if self._stream_buffer is None:
+            text_view = Gtk.TextView()
+            text_view.set_editable(False)
+            text_view.set_cursor_visible(False)
+            text_view.set_wrap_mode(Gtk.WrapMode.WORD)
+            text_view.get_style_context().add_class("message-text")
+            self.content_area.pack_start(text_view, False, False, 0)
+            text_view.show()
+            self._stream_buffer = text_view.get_buffer()
+        
+        self._stream_buffer.insert(self._stream_buffer.get_end_iter(), text)
+    
+    def finish_stream(self, content: str, rendered=None):
+        """Replace the streamed plain text with the fully rendered message"""
+        for child in self.content_area.get_children():
+            self.content_area.remove(child)
+        self._stream_buffer = None
+        
+        self.content = content
+        self._rendered = rendered
+        self._parse_content()
+        self.content_area.show_all()
+    
     def _copy_code(self, code: str):
         """Copy code to clipboard"""
         try:
@@ -376,6 +574,13 @@ class GTKChatTab:
         self.chat_scroll.add(self.messages_box)
         self.container.pack_start(self.chat_scroll, True, True, 0)
         
+        # Follow new content once layout has sized it, rather than guessing
+        # the bottom from an idle callback that may run before allocation
+        self._follow_bottom = True
+        vadj = self.chat_scroll.get_vadjustment()
+        vadj.connect("changed", self._on_scroll_range_changed)
+        vadj.connect("value-changed", self._on_scroll_value_changed)
+        
         # Input area
         self._create_input_area()
     
@@ -447,19 +652,18 @@ class GTKChatTab:
             # For now, we'll add a placeholder
             # self._get_llm_response(text)
     
-    def add_message(self, sender: str, content: str, role: str):
+    def add_message(self, sender: str, content: str, role: str, rendered=None):
         """Add a message to the chat"""
         try:
             # Create message bubble
-            message = MessageBubble(sender, content, role, config=self.config)
+            message = MessageBubble(sender, content, role, config=self.config, rendered=rendered)
             
             # Add to messages container
             self.messages_box.pack_start(message, False, False, 0)
             message.show_all()
             
-            # Scroll to bottom
-            vadj = self.chat_scroll.get_vadjustment()
-            GLib.idle_add(lambda: vadj.set_value(vadj.get_upper() - vadj.get_page_size()))
+            # Scroll to bottom once the new bubble has been allocated
+            self._follow_bottom = True
             
             # Add to conversation manager
             if role == "user":
@@ -470,6 +674,31 @@ class GTKChatTab:
         except Exception as e:
             log_exception(e, "Failed to add message")
     
+    def begin_stream(self, sender: str) -> MessageBubble:
+        """Add an empty assistant bubble for a reply that is still streaming"""
+        message = MessageBubble(sender, "", "assistant", config=self.config)
+        self.messages_box.pack_start(message, False, False, 0)
+        message.show_all()
+        self._follow_bottom = True
+        return message
+    
+    def finish_stream(self, message: MessageBubble, content: str, rendered=None):
+        """Render a completed streamed reply and record it in the conversation"""
+        try:
+            message.finish_stream(content, rendered)
+            self.conversation_manager.add_assistant_message(content)
+        except Exception as e:
+            log_exception(e, "Failed to finish streamed message")
+    
+    def _on_scroll_range_changed(self, vadj):
+        """Keep the view pinned to the newest message as the range grows"""
+        if self._follow_bottom:
+            vadj.set_value(vadj.get_upper() - vadj.get_page_size())
+    
+    def _on_scroll_value_changed(self, vadj):
+        """Stop following new content when the user scrolls up"""
+        self._follow_bottom = vadj.get_value() >= vadj.get_upper() - vadj.get_page_size() - 1
+    
     def clear_chat(self):
         """Clear all messages"""
         for child in self.messages_box.get_children():
@@ -489,6 +718,29 @@ class GTKChatWindow(Gtk.Window):
         self.tabs: Dict[str, GTKChatTab] = {}
         self.tab_counter = 0
         
+        # Kept in sync with the notebook's switch-page signal so the current
+        # tab is a dict lookup instead of a scan over every tab
+        self._tabs_by_page: Dict[Gtk.Widget, GTKChatTab] = {}
+        self.current_tab_id: Optional[str] = None
+        
+        # One long-lived event loop for all LLM calls and the IPC server, so
+        # loop setup is paid once and the client's HTTP connections are reused
+        # uvloop's libuv-based loop when installed, stdlib loop otherwise
+        self._loop = uvloop.new_event_loop() if uvloop is not None else asyncio.new_event_loop()
+        # Python 3.12+: run new tasks eagerly so cache hits finish without a loop hop
+        eager_task_factory = getattr(asyncio, 'eager_task_factory', None)
+        if eager_task_factory is not None:
+            self._loop.set_task_factory(eager_task_factory)
+        self._loop_thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._loop_thread.start()
+        
+        # LRU cache of LLM responses, keyed by screenshot content + prompt.
+        # Only touched from the background loop thread.
+        self._response_cache: "OrderedDict[bytes, str]" = OrderedDict()
+        
+        # Created on the loop thread by _llm_slot, bounding concurrent calls
+        self._llm_semaphore: Optional[asyncio.Semaphore] = None
+        
         # Initialize components
         try:
             self.image_processor = get_image_processor()
@@ -496,12 +748,19 @@ class GTKChatWindow(Gtk.Window):
             logger.warning(f"Image processor initialization failed: {e}")
             self.image_processor = None
             
+        # One connection pool for every LLM request this window makes
+        self._http = create_http_client()
+        
         try:
-            self.llm_client = LLMClient(self.config.get('llm', {}))
+            self.llm_client = LLMClient(self.config.get('llm', {}), http_client=self._http)
         except Exception as e:
             logger.warning(f"LLM client initialization failed: {e}")
             self.llm_client = None
             
+        self.ipc_server = None
+        # IPC messages waiting for the GTK thread, drained by one idle flush
+        self._ipc_pending: List[Tuple[Callable[[Dict], None], Dict]] = []
+        self._ipc_lock = threading.Lock()
         try:
             self.ipc_manager = IPCManager()
             logger.info("IPC manager initialized successfully")
@@ -535,81 +794,18 @@ class GTKChatWindow(Gtk.Window):
     
     def _load_styles(self):
         """Load CSS styles for the chat window"""
-        css = """
-        /* GTK Chat Window Styles */
-        .code-block {
-            background-color: #1e1e1e;
-            border: 1px solid #48b9c7;
-            border-radius: 4px;
-        }
-        
-        .code-header {
-            background-color: #333333;
-            border-bottom: 1px solid #555555;
-        }
-        
-        .code-content {
-            background-color: #1e1e1e;
-            color: #f8f8f2;
-            font-family: "SF Mono", "Consolas", monospace;
-            font-size: 10px;
-        }
-        
-        .copy-button {
-            background: linear-gradient(135deg, #48b9c7, #5cc7d5);
-            color: #ffffff;
-            border: none;
-            border-radius: 4px;
-            padding: 4px 8px;
-            font-size: 9px;
-        }
-        
-        .copy-button:hover {
-            background: linear-gradient(135deg, #5cc7d5, #6dd0de);
-        }
-        
-        .message-text {
-            background-color: transparent;
-            color: #ffffff;
-            font-family: "SF Pro Display", sans-serif;
-            font-size: 11px;
-        }
-        
-        .input-area {
-            background-color: #3c3c3c;
-            border-top: 1px solid #48b9c7;
-        }
-        
-        .input-text {
-            background-color: #2d2d2d;
-            color: #ffffff;
-            font-family: "SF Pro Display", sans-serif;
-            font-size: 11px;
-        }
-        
-        .send-button {
-            background: linear-gradient(135deg, #48b9c7, #5cc7d5);
-            color: #ffffff;
-            border: none;
-            border-radius: 4px;
-            padding: 8px 16px;
-        }
-        
-        .send-button:hover {
-            background: linear-gradient(135deg, #5cc7d5, #6dd0de);
-        }
-        
-        .timestamp {
-            color: #b0b0b0;
-            font-size: 9px;
-        }
-        """
-        
-        provider = Gtk.CssProvider()
-        provider.load_from_data(css.encode())
+        global _style_provider
+        
+        # The stylesheet is static, so parse it and attach it to the screen
+        # once per process rather than once per window
+        if _style_provider is not None:
+            return
+        
+        _style_provider = Gtk.CssProvider()
+        _style_provider.load_from_data(CHAT_CSS.encode())
         Gtk.StyleContext.add_provider_for_screen(
             Gdk.Screen.get_default(),
-            provider,
+            _style_provider,
             Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION
         )
     
@@ -633,6 +829,7 @@ class GTKChatWindow(Gtk.Window):
         # Create notebook for tabs
         self.notebook = Gtk.Notebook()
         self.notebook.set_scrollable(True)
+        self.notebook.connect("switch-page", self._on_switch_page)
         main_box.pack_start(self.notebook, True, True, 0)
         
         # Create first tab
@@ -653,6 +850,10 @@ class GTKChatWindow(Gtk.Window):
         self.status_bar = Gtk.Statusbar()
         self.status_context = self.status_bar.get_context_id("main")
         self.status_bar.push(self.status_context, "Ready - Waiting for screenshots...")
+        
+        # Latest status text waiting for the next idle flush
+        self._pending_status: Optional[str] = None
+        self._status_lock = threading.Lock()
         main_box.pack_end(self.status_bar, False, False, 0)
     
     def _start_ipc_server(self):
@@ -666,27 +867,54 @@ class GTKChatWindow(Gtk.Window):
             self.ipc_server = self.ipc_manager.create_server()
             logger.info(f"IPC server created: {self.ipc_server}")
             
-            # Register message handlers
-            self.ipc_server.register_handler("screenshot", self._handle_screenshot_message)
-            self.ipc_server.register_handler("show_window", self._handle_show_window)
-            self.ipc_server.register_handler("hide_window", self._handle_hide_window)
-            self.ipc_server.register_handler("add_message", self._handle_add_message)
+            # Remove the socket even if the process exits without closing
+            # the window (e.g. Ctrl+C); stop() is safe to call twice
+            atexit.register(self.ipc_server.stop)
             
-            # Start server in background thread
-            def start_server():
+            # Register message handlers; they touch widgets, so run them on
+            # the GTK thread rather than the loop thread the server uses
+            self.ipc_server.register_handler("screenshot", self._on_ui_thread(self._handle_screenshot_message))
+            self.ipc_server.register_handler("show_window", self._on_ui_thread(self._handle_show_window))
+            self.ipc_server.register_handler("hide_window", self._on_ui_thread(self._handle_hide_window))
+            self.ipc_server.register_handler("add_message", self._on_ui_thread(self._handle_add_message))
+            
+            # Serve on the shared background loop rather than a second
+            # thread with its own event loop
+            def on_server_done(future):
                 try:
-                    asyncio.run(self.ipc_server.start())
+                    future.result()
                 except Exception as e:
                     log_exception(e, "IPC server failed")
             
-            self.ipc_thread = threading.Thread(target=start_server, daemon=True)
-            self.ipc_thread.start()
+            server_future = asyncio.run_coroutine_threadsafe(self.ipc_server.start(), self._loop)
+            server_future.add_done_callback(on_server_done)
             
             logger.info("GTK IPC server started")
             
         except Exception as e:
             log_exception(e, "Failed to start IPC server")
     
+    def _on_ui_thread(self, handler: Callable[[Dict], None]) -> Callable[[Dict], None]:
+        """Wrap an IPC handler to queue its messages for the next UI flush"""
+        def enqueue(data: Dict):
+            with self._ipc_lock:
+                schedule = not self._ipc_pending
+                self._ipc_pending.append((handler, data))
+            if schedule:
+                GLib.idle_add(self._flush_ipc)
+        return enqueue
+    
+    def _flush_ipc(self):
+        """Run every queued IPC message in one pass on the GTK thread"""
+        with self._ipc_lock:
+            batch, self._ipc_pending = self._ipc_pending, []
+        for handler, data in batch:
+            try:
+                handler(data)
+            except Exception as e:
+                log_exception(e, "IPC handler failed")
+        return False
+    
     def new_tab(self) -> str:
         """Create a new chat tab"""
         try:
@@ -698,12 +926,16 @@ class GTKChatWindow(Gtk.Window):
             logger.info("Creating GTKChatTab instance...")
             tab = GTKChatTab(self.notebook, tab_id, self.config)
             self.tabs[tab_id] = tab
+            self._tabs_by_page[tab.container] = tab
+            # Don't lose a debounced auto-save on abnormal exit
+            atexit.register(tab.conversation_manager.flush_auto_save)
             logger.info(f"Tab {tab_id} created and added to tabs dict")
             
             # Select the new tab
             page_num = self.notebook.page_num(tab.container)
             logger.info(f"Tab page number: {page_num}")
             self.notebook.set_current_page(page_num)
+            self.current_tab_id = tab_id
             
             # Ensure widgets are shown
             tab.container.show_all()
@@ -717,20 +949,15 @@ class GTKChatWindow(Gtk.Window):
     
     def get_current_tab(self) -> Optional[GTKChatTab]:
         """Get the currently selected tab"""
-        try:
-            current_page = self.notebook.get_current_page()
-            current_widget = self.notebook.get_nth_page(current_page)
-            
-            # Find the tab that owns this widget
-            for tab in self.tabs.values():
-                if tab.container == current_widget:
-                    return tab
-            
-            return None
-            
-        except Exception as e:
-            log_exception(e, "Failed to get current tab")
-            return None
+        return self.tabs.get(self.current_tab_id)
+    
+    def _on_switch_page(self, notebook, page, page_num):
+        """Track the selected tab as the notebook switches pages"""
+        tab = self._tabs_by_page.get(page)
+        # A tab's first page switch fires from append_page, before new_tab
+        # has registered it; new_tab sets current_tab_id itself afterwards
+        if tab is not None:
+            self.current_tab_id = tab.tab_id
     
     def _handle_screenshot_message(self, data: Dict):
         """Handle incoming screenshot from daemon"""
@@ -749,7 +976,7 @@ class GTKChatWindow(Gtk.Window):
             self._process_screenshot(image_path, context)
             
             # Update status
-            self.status_bar.push(self.status_context, "Processing screenshot...")
+            self._set_status("Processing screenshot...")
             
         except Exception as e:
             log_exception(e, "Failed to handle screenshot message")
@@ -778,58 +1005,149 @@ class GTKChatWindow(Gtk.Window):
     
     def _get_llm_response_for_screenshot(self, tab: GTKChatTab, image_path: str, context: Dict):
         """Get LLM response for a screenshot"""
-        def get_response():
+        # Build context prompt
+        context_prompt = self._build_context_prompt(context)
+        
+        async def async_get_response():
             try:
-                # Build context prompt
-                context_prompt = self._build_context_prompt(context)
+                # Read the screenshot once, off the GTK thread, and reuse the
+                # bytes for both the cache key and the upload
+                data = await asyncio.get_event_loop().run_in_executor(
+                    None, self._read_screenshot, image_path
+                )
                 
-                # Use asyncio to call the async LLM client
-                async def async_get_response():
-                    try:
-                        # Get conversation messages for API
-                        api_messages = tab.conversation_manager.get_messages_for_api()
-                        
-                        response = await self.llm_client.send_screenshot(image_path, context_prompt)
-                        return response
-                    except Exception as e:
-                        log_exception(e, "LLM API call failed")
-                        return "I apologize, but I encountered an error while analyzing the screenshot."
+                # Identical screenshot and context: skip the API round-trip
+                cache_key = self._response_cache_key(data, context_prompt)
+                if cache_key in self._response_cache:
+                    self._response_cache.move_to_end(cache_key)
+                    return self._response_cache[cache_key]
                 
-                # Run the async function
-                try:
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    response = loop.run_until_complete(async_get_response())
-                    loop.close()
-                except Exception as e:
-                    log_exception(e, "Asyncio execution failed")
-                    response = "Failed to process the screenshot analysis request."
+                # Don't upload pixels the model would downsample away
+                mime_type = None
+                if self.image_processor is not None:
+                    data, mime_type = await asyncio.get_event_loop().run_in_executor(
+                        None, self.image_processor.fit_for_llm, data
+                    )
                 
-                # Display response in UI thread
-                GLib.idle_add(lambda: tab.add_message("Assistant", response, "assistant"))
-                GLib.idle_add(lambda: self.status_bar.push(self.status_context, "Analysis complete"))
+                parts = []
+                async with self._llm_slot():
+                    async for chunk in self.llm_client.stream_screenshot(image_path, context_prompt,
+                                                                         image_bytes=data,
+                                                                         mime_type=mime_type):
+                        parts.append(chunk)
+                        pending.append(chunk)
+                response = "".join(parts)
                 
+                self._response_cache[cache_key] = response
+                if len(self._response_cache) > RESPONSE_CACHE_SIZE:
+                    self._response_cache.popitem(last=False)
+                return response
+            except Exception as e:
+                log_exception(e, "LLM API call failed")
+                return "I apologize, but I encountered an error while analyzing the screenshot."
+        
+        async def analyze():
+            response = await async_get_response()
+            # Markdown rendering is pure string work; keep it off both the
+            # GTK thread and the event loop
+            rendered = await asyncio.get_event_loop().run_in_executor(
+                None, _render_markdown, response
+            )
+            return response, rendered
+        
+        # Chunks from the loop thread; deque appends and pops are thread-safe
+        pending = deque()
+        bubble = None
+        
+        def drain():
+            nonlocal bubble
+            # Check completion before draining: every chunk is queued before
+            # the coroutine returns, so nothing can be left behind
+            done = future.done()
+            
+            if pending:
+                text = "".join(pending.popleft() for _ in range(len(pending)))
+                if bubble is None:
+                    bubble = tab.begin_stream("Assistant")
+                bubble.append_text(text)
+            
+            if not done:
+                return True
+            
+            try:
+                response, rendered = future.result()
             except Exception as e:
-                log_exception(e, "Failed to get LLM response")
-                GLib.idle_add(lambda: self.status_bar.push(self.status_context, "Failed to get LLM analysis"))
+                log_exception(e, "Asyncio execution failed")
+                response = "Failed to process the screenshot analysis request."
+                rendered = None
+            
+            if bubble is None:
+                return self._show_llm_response(tab, response, "Analysis complete", rendered)
+            
+            tab.finish_stream(bubble, response, rendered)
+            self._set_status("Analysis complete")
+            return False
         
-        # Run in background thread
-        threading.Thread(target=get_response, daemon=True).start()
+        # Run on the shared background loop and batch streamed chunks into
+        # one GTK update per STREAM_FLUSH_MS
+        try:
+            future = asyncio.run_coroutine_threadsafe(analyze(), self._loop)
+            GLib.timeout_add(STREAM_FLUSH_MS, drain)
+        except Exception as e:
+            log_exception(e, "Failed to get LLM response")
+            self._set_status("Failed to get LLM analysis")
+    
+    def _llm_slot(self) -> asyncio.Semaphore:
+        """Semaphore limiting concurrent LLM requests; use from the loop thread"""
+        # Built lazily so it binds to the background loop, not the GTK thread
+        if self._llm_semaphore is None:
+            self._llm_semaphore = asyncio.Semaphore(MAX_CONCURRENT_LLM_CALLS)
+        return self._llm_semaphore
+    
+    def _read_screenshot(self, image_path: str) -> memoryview:
+        """Map screenshot bytes from disk without copying them onto the heap"""
+        with open(image_path, 'rb') as f:
+            # The mapping outlives the file object and is released with the view
+            return memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+    
+    def _response_cache_key(self, image_bytes: bytes, context_prompt: str) -> bytes:
+        """Hash the screenshot bytes and prompt into a response cache key"""
+        digest = hashlib.blake2b(image_bytes, digest_size=32)
+        digest.update((context_prompt or "").encode('utf-8'))
+        return digest.digest()
+    
+    def _show_llm_response(self, tab: GTKChatTab, response: str, status: str, rendered=None):
+        """Add an assistant reply and update the status bar in one idle callback"""
+        tab.add_message("Assistant", response, "assistant", rendered)
+        self._set_status(status)
+        return False
+    
+    def _set_status(self, text: str):
+        """Show text in the status bar, coalescing bursts into one idle update"""
+        # Safe from any thread: only the UI thread touches the widget
+        with self._status_lock:
+            schedule = self._pending_status is None
+            self._pending_status = text
+        if schedule:
+            GLib.idle_add(self._flush_status)
+    
+    def _flush_status(self):
+        """Replace the status bar message with the latest pending text"""
+        with self._status_lock:
+            text, self._pending_status = self._pending_status, None
+        if text is not None:
+            # Replace rather than stack, so the statusbar's message stack stays flat
+            self.status_bar.remove_all(self.status_context)
+            self.status_bar.push(self.status_context, text)
+        return False
     
     def _build_context_prompt(self, context: Dict) -> str:
         """Build context prompt from application context"""
-        parts = ["I'm currently working with:"]
-        
-        if context.get('app_name'):
-            parts.append(f"- Application: {context['app_name']}")
-        
-        if context.get('window_title'):
-            parts.append(f"- Window: {context['window_title']}")
-        
-        if context.get('working_directory'):
-            parts.append(f"- Directory: {context['working_directory']}")
-        
-        return "\n".join(parts)
+        return _context_prompt(
+            context.get('app_name'),
+            context.get('window_title'),
+            context.get('working_directory')
+        )
     
     def _handle_show_window(self, data: Dict):
         """Handle show window request"""
@@ -866,18 +1184,40 @@ class GTKChatWindow(Gtk.Window):
         # Properly shut down the application
         logger.info("Window close requested, shutting down application")
         
-        # Stop IPC server if running
-        if hasattr(self, 'ipc_server') and self.ipc_server:
-            try:
-                self.ipc_server.stop()
-                logger.info("IPC server stopped")
-            except Exception as e:
-                logger.warning(f"Error stopping IPC server: {e}")
+        # Save conversations, stop IPC and close pooled connections on the
+        # background loop, then stop it; wait briefly so saves land on disk
+        shutdown = asyncio.run_coroutine_threadsafe(self._shutdown_loop(), self._loop)
+        try:
+            shutdown.result(timeout=5)
+        except Exception as e:
+            logger.warning(f"Error during shutdown: {e}")
         
         # Quit GTK main loop
         Gtk.main_quit()
         return False  # Allow window to be destroyed
 
+    async def _shutdown_loop(self):
+        """Run independent shutdown steps concurrently, then stop the loop"""
+        loop = asyncio.get_event_loop()
+        steps = [
+            loop.run_in_executor(None, tab.conversation_manager.flush_auto_save)
+            for tab in self.tabs.values()
+        ]
+        if self.ipc_server:
+            steps.append(loop.run_in_executor(None, self.ipc_server.stop))
+        if self.image_processor:
+            steps.append(loop.run_in_executor(None, self.image_processor.cleanup))
+        if self._http is not None:
+            steps.append(self._http.aclose())
+        
+        try:
+            results = await asyncio.gather(*steps, return_exceptions=True)
+            for result in results:
+                if isinstance(result, Exception):
+                    logger.warning(f"Shutdown step failed: {result}")
+        finally:
+            loop.call_soon(loop.stop)
+    
     def _on_settings_clicked(self, button):
         """Show the settings dialog."""
         dialog = SettingsWindow(self, self.config)
@@ -171,6 +171,11 @@ class GTKConversationBrowser(Gtk.Dialog):
     
     def _populate_conversations(self):
         """Populate the tree view with conversations"""
+        # Fill the store detached and unsorted, so the view lays out and the
+        # store sorts once rather than on every appended row
+        self.tree_view.set_model(None)
+        self.list_store.set_sort_column_id(Gtk.TREE_SORTABLE_UNSORTED_SORT_COLUMN_ID,
+                                           Gtk.SortType.ASCENDING)
         self.list_store.clear()
         
         for conv in self.conversations:
@@ -205,6 +210,7 @@ class GTKConversationBrowser(Gtk.Dialog):
         
         # Sort by date (newest first)
         self.list_store.set_sort_column_id(2, Gtk.SortType.DESCENDING)
+        self.tree_view.set_model(self.list_store)
     
     def _on_selection_changed(self, selection):
         """Handle selection change in tree view"""
@@ -4,13 +4,21 @@ Image processing utilities for Screenshot LLM Assistant
 """
 
 import io
-import threading
-from typing import Callable, Optional
-from PIL import Image, ImageOps
-from .logger import get_logger, log_exception
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Tuple
+from PIL import Image
+try:
+    from .logger import get_logger, log_exception
+except ImportError:
+    # Imported as a top-level module with lib/ on sys.path
+    from logger import get_logger, log_exception
 
 logger = get_logger(__name__)
 
+# Vision models downsample anything with a longer edge than this server-side,
+# so larger screenshots only cost upload bytes
+LLM_MAX_EDGE = 1568
+
 class ImageProcessor:
     """Handles image processing operations like thumbnails and optimization"""
     
@@ -19,25 +27,26 @@ class ImageProcessor:
         self.max_size = (1920, 1080)
         self.quality = 85
         
+        # Shared workers for async processing instead of a thread per image
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="image")
+        
     def create_thumbnail(self, image_data: bytes) -> bytes:
         """Create a thumbnail from image data"""
         try:
-            # Open image from bytes
-            image = Image.open(io.BytesIO(image_data))
-            
-            # Convert to RGB if necessary
-            if image.mode != 'RGB':
-                image = image.convert('RGB')
-            
-            # Create thumbnail
-            image.thumbnail(self.thumbnail_size, Image.Resampling.LANCZOS)
-            
-            # Save to bytes
-            output = io.BytesIO()
-            image.save(output, format='JPEG', quality=self.quality)
-            output.seek(0)
-            
-            return output.getvalue()
+            # Open image from bytes; closing it frees the decoder buffers
+            # as soon as the JPEG is written instead of at garbage collection
+            with Image.open(io.BytesIO(image_data)) as image:
+                # Convert to RGB if necessary
+                rgb = image.convert('RGB') if image.mode != 'RGB' else image
+                
+                # Create thumbnail
+                rgb.thumbnail(self.thumbnail_size, Image.Resampling.LANCZOS)
+                
+                # Save to bytes
+                output = io.BytesIO()
+                rgb.save(output, format='JPEG', quality=self.quality)
+                
+                return output.getvalue()
             
         except Exception as e:
             log_exception(e, "Failed to create thumbnail")
@@ -47,27 +56,50 @@ class ImageProcessor:
         """Optimize image for display/transmission"""
         try:
             # Open image from bytes
-            image = Image.open(io.BytesIO(image_data))
-            
-            # Convert to RGB if necessary
-            if image.mode != 'RGB':
-                image = image.convert('RGB')
-            
-            # Resize if too large
-            if image.size[0] > self.max_size[0] or image.size[1] > self.max_size[1]:
-                image.thumbnail(self.max_size, Image.Resampling.LANCZOS)
-            
-            # Save optimized
-            output = io.BytesIO()
-            image.save(output, format='JPEG', quality=self.quality, optimize=True)
-            output.seek(0)
-            
-            return output.getvalue()
+            with Image.open(io.BytesIO(image_data)) as image:
+                # Convert to RGB if necessary
+                rgb = image.convert('RGB') if image.mode != 'RGB' else image
+                
+                # Resize if too large
+                if rgb.size[0] > self.max_size[0] or rgb.size[1] > self.max_size[1]:
+                    rgb.thumbnail(self.max_size, Image.Resampling.LANCZOS)
+                
+                # Save optimized
+                output = io.BytesIO()
+                rgb.save(output, format='JPEG', quality=self.quality, optimize=True)
+                
+                return output.getvalue()
             
         except Exception as e:
             log_exception(e, "Failed to optimize image")
             raise
     
+    def fit_for_llm(self, image_data: bytes) -> Tuple[bytes, Optional[str]]:
+        """Downscale a screenshot to the LLM's effective resolution.
+        
+        Returns the image bytes and their MIME type, or the original bytes and
+        None if the image is already small enough.
+        """
+        size = (LLM_MAX_EDGE, LLM_MAX_EDGE)
+        try:
+            with Image.open(io.BytesIO(image_data)) as image:
+                if max(image.size) <= LLM_MAX_EDGE:
+                    return image_data, None
+                
+                # Palette and bilevel images would be resampled with NEAREST
+                fitted = image.convert('RGBA') if image.mode in ('1', 'P') else image
+                fitted.thumbnail(size, Image.Resampling.LANCZOS)
+                
+                # PNG keeps UI text crisp, where JPEG would smear it
+                output = io.BytesIO()
+                fitted.save(output, format='PNG')
+                return output.getvalue(), 'image/png'
+            
+        except Exception as e:
+            # Sending the full-size original still works, just costs more
+            log_exception(e, "Failed to downscale image for LLM")
+            return image_data, None
+    
     def process_image_async(self, image_data: bytes, callback: Callable[[bytes], None], 
                           optimize: bool = True, thumbnail: bool = False):
         """Process image asynchronously and call callback with result"""
@@ -85,22 +117,21 @@ class ImageProcessor:
             except Exception as e:
                 log_exception(e, "Async image processing failed")
         
-        thread = threading.Thread(target=process, daemon=True)
-        thread.start()
+        self._executor.submit(process)
     
     def get_image_dimensions(self, image_data: bytes) -> tuple:
         """Get image dimensions"""
         try:
-            image = Image.open(io.BytesIO(image_data))
-            return image.size
+            # Only the header is read; close without decoding pixels
+            with Image.open(io.BytesIO(image_data)) as image:
+                return image.size
         except Exception as e:
             log_exception(e, "Failed to get image dimensions")
             return (0, 0)
     
     def cleanup(self):
         """Cleanup resources"""
-        # Nothing to cleanup for now
-        pass
+        self._executor.shutdown(wait=False)
 
 # Global instance
 _image_processor = None
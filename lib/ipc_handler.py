@@ -11,12 +11,29 @@ import json
 import logging
 import os
 import socket
+import struct
 import threading
-from typing import Dict, Any, Callable, Optional
+from typing import Dict, Any, Callable, Optional, Set, Tuple
 from pathlib import Path
 
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
 logger = logging.getLogger(__name__)
 
+# Every frame is a 4-byte big-endian payload length followed by the payload
+_FRAME_HEADER = struct.Struct(">I")
+
+# Bytes to ask for per read, so a header and a small payload arrive together
+_RECV_CHUNK = 64 * 1024
+
+# First payload byte names the serialization, so a peer decodes each frame by
+# what was sent rather than by which libraries it happens to have installed
+_FORMAT_JSON = b'J'
+_FORMAT_MSGPACK = b'M'
+
 class IPCMessage:
     """Represents an IPC message"""
     def __init__(self, command: str, data: Dict[str, Any] = None):
@@ -36,6 +53,36 @@ class IPCMessage:
         """Deserialize message from JSON"""
         data = json.loads(json_str)
         return cls(data["command"], data.get("data", {}))
+    
+    def encode(self) -> Tuple[bytes, bytes]:
+        """Serialize message as (format tag, body); msgpack when available, else JSON"""
+        if msgpack is not None:
+            return _FORMAT_MSGPACK, msgpack.packb({
+                "command": self.command,
+                "data": self.data
+            }, use_bin_type=True)
+        return _FORMAT_JSON, self.to_json().encode('utf-8')
+    
+    def to_bytes(self) -> bytes:
+        """Serialize message for the wire, prefixed with its format tag"""
+        return b"".join(self.encode())
+    
+    @classmethod
+    def from_bytes(cls, payload: bytes) -> 'IPCMessage':
+        """Deserialize message from the wire according to its format tag"""
+        tag = payload[:1]
+        if tag == _FORMAT_MSGPACK:
+            if msgpack is None:
+                raise ValueError("Received a msgpack IPC message but msgpack is not "
+                                 "installed in this interpreter")
+            data = msgpack.unpackb(memoryview(payload)[1:], raw=False)
+            return cls(data["command"], data.get("data", {}))
+        if tag == _FORMAT_JSON:
+            return cls.from_json(payload[1:].decode('utf-8'))
+        if tag == b'{':
+            # Untagged JSON from a peer predating format tags
+            return cls.from_json(payload.decode('utf-8'))
+        raise ValueError(f"Unknown IPC message format: {tag!r}")
 
 class IPCServer:
     """IPC Server for receiving messages (used by GUI)"""
@@ -46,6 +93,10 @@ class IPCServer:
         self.running = False
         self.message_handlers: Dict[str, Callable] = {}
         self.clients = []
+        # Loop serving the socket and its tasks, so stop() can cancel them
+        # from any thread
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: Set[asyncio.Task] = set()
         
     def register_handler(self, command: str, handler: Callable):
         """Register a handler for a specific command"""
@@ -61,68 +112,76 @@ class IPCServer:
         # Ensure directory exists
         os.makedirs(os.path.dirname(self.socket_path), exist_ok=True)
         
-        # Create Unix domain socket
+        # Create Unix domain socket; non-blocking so the event loop waits on
+        # it directly instead of parking a worker thread in accept()
         self.server_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
         self.server_socket.bind(self.socket_path)
         self.server_socket.listen(5)
+        self.server_socket.setblocking(False)
         
         # Set permissions (user only)
         os.chmod(self.socket_path, 0o600)
         
         self.running = True
+        self._loop = asyncio.get_running_loop()
+        self._track(asyncio.current_task())
         logger.info(f"IPC server started on: {self.socket_path}")
         
         try:
             while self.running:
                 # Accept connections
                 try:
-                    client_socket, addr = await asyncio.get_event_loop().run_in_executor(
-                        None, self.server_socket.accept
-                    )
+                    client_socket, addr = await self._loop.sock_accept(self.server_socket)
+                    client_socket.setblocking(False)
                     
                     # Handle client in background
-                    asyncio.create_task(self._handle_client(client_socket))
+                    self._track(asyncio.create_task(self._handle_client(client_socket)))
                     
-                except Exception as e:
-                    if self.running:
-                        logger.error(f"Error accepting connection: {e}")
+                except (OSError, ValueError) as e:
+                    if not self.running:
+                        break
+                    logger.error(f"Error accepting connection: {e}")
                     
+        except asyncio.CancelledError:
+            pass  # stop() was called
         except Exception as e:
             logger.error(f"Server error: {e}")
         finally:
-            self.stop()
+            # Unless stop() is already tearing the server down
+            if self.running:
+                self.stop()
+    
+    def _track(self, task: asyncio.Task):
+        """Remember a server task until it finishes, so stop() can cancel it"""
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+    
+    async def _shutdown(self):
+        """Cancel the accept loop and client readers, then close the sockets
+        once nothing is waiting on them; runs on the server loop"""
+        current = asyncio.current_task()
+        tasks = [task for task in self._tasks if task is not current]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._close()
     
     async def _handle_client(self, client_socket):
         """Handle messages from a client"""
         try:
             self.clients.append(client_socket)
             
+            # Bytes received past the end of the previous frame
+            pending = bytearray()
+            
             while self.running:
                 try:
-                    # Read message length first (4 bytes)
-                    length_data = await asyncio.get_event_loop().run_in_executor(
-                        None, client_socket.recv, 4
-                    )
+                    message_data = await self._read_frame(client_socket, pending)
                     
-                    if not length_data:
+                    if message_data is None:
                         break
                     
-                    message_length = int.from_bytes(length_data, byteorder='big')
-                    
-                    # Read the actual message
-                    message_data = b''
-                    while len(message_data) < message_length:
-                        chunk = await asyncio.get_event_loop().run_in_executor(
-                            None, client_socket.recv, message_length - len(message_data)
-                        )
-                        if not chunk:
-                            break
-                        message_data += chunk
-                    
-                    if len(message_data) == message_length:
-                        # Process message
-                        message_str = message_data.decode('utf-8')
-                        await self._process_message(message_str)
+                    await self._process_message(message_data)
                     
                 except Exception as e:
                     logger.debug(f"Client communication error: {e}")
@@ -138,10 +197,45 @@ class IPCServer:
             except:
                 pass
     
-    async def _process_message(self, message_str: str):
+    async def _read_frame(self, client_socket, pending: bytearray) -> Optional[bytes]:
+        """Read one frame's payload, or None if the peer closed first"""
+        # Read ahead so the common small message needs a single recv
+        while len(pending) < _FRAME_HEADER.size:
+            chunk = await self._loop.sock_recv(client_socket, _RECV_CHUNK)
+            if not chunk:
+                return None
+            pending += chunk
+        
+        message_length, = _FRAME_HEADER.unpack_from(pending)
+        end = _FRAME_HEADER.size + message_length
+        if len(pending) >= end:
+            payload = bytes(pending[_FRAME_HEADER.size:end])
+            del pending[:end]
+            return payload
+        
+        # Large payload (a screenshot): receive the rest straight into place
+        buffer = bytearray(message_length)
+        buffered = len(pending) - _FRAME_HEADER.size
+        buffer[:buffered] = pending[_FRAME_HEADER.size:]
+        pending.clear()
+        if not await self._recv_exactly(client_socket, memoryview(buffer)[buffered:]):
+            return None
+        return bytes(buffer)
+    
+    async def _recv_exactly(self, client_socket, view: memoryview) -> bool:
+        """Fill view from the socket, or return False if the peer closed first"""
+        received = 0
+        while received < len(view):
+            count = await self._loop.sock_recv_into(client_socket, view[received:])
+            if not count:
+                return False
+            received += count
+        return True
+    
+    async def _process_message(self, message_data: bytes):
         """Process incoming message"""
         try:
-            message = IPCMessage.from_json(message_str)
+            message = IPCMessage.from_bytes(message_data)
             logger.debug(f"Received IPC message: {message.command}")
             
             # Call appropriate handler
@@ -161,6 +255,30 @@ class IPCServer:
         """Stop the IPC server"""
         self.running = False
         
+        # Sockets still awaited by sock_accept/sock_recv must outlive the
+        # tasks awaiting them, so tear down on the server loop when it's up
+        loop = self._loop
+        if loop is not None and loop.is_running():
+            try:
+                on_loop = asyncio.get_running_loop() is loop
+            except RuntimeError:
+                on_loop = False
+            
+            if on_loop:
+                # Can't block the loop waiting for its own tasks
+                self._track(loop.create_task(self._shutdown()))
+                return
+            
+            try:
+                asyncio.run_coroutine_threadsafe(self._shutdown(), loop).result(timeout=5)
+                return
+            except Exception as e:
+                logger.debug(f"IPC server shutdown on its loop failed: {e}")
+        
+        self._close()
+    
+    def _close(self):
+        """Close the sockets and remove the socket file"""
         # Close all client connections
         for client in self.clients[:]:
             try:
@@ -250,14 +368,10 @@ class IPCClient:
                 return False
         
         try:
-            message_str = message.to_json()
-            message_bytes = message_str.encode('utf-8')
-            
-            # Send message length first
-            length_bytes = len(message_bytes).to_bytes(4, byteorder='big')
+            frame = self._frame(message)
             
             await asyncio.get_event_loop().run_in_executor(
-                None, self.socket.send, length_bytes + message_bytes
+                None, self.socket.sendall, frame
             )
             
             logger.debug(f"Sent IPC message: {message.command}")
@@ -270,12 +384,10 @@ class IPCClient:
             # Try to reconnect and send once more
             if await self.connect():
                 try:
-                    message_str = message.to_json()
-                    message_bytes = message_str.encode('utf-8')
-                    length_bytes = len(message_bytes).to_bytes(4, byteorder='big')
+                    frame = self._frame(message)
                     
                     await asyncio.get_event_loop().run_in_executor(
-                        None, self.socket.send, length_bytes + message_bytes
+                        None, self.socket.sendall, frame
                     )
                     
                     logger.debug(f"Sent IPC message after reconnect: {message.command}")
@@ -292,6 +404,11 @@ class IPCClient:
             self.disconnect()
             return False
     
+    def _frame(self, message: IPCMessage) -> bytes:
+        """Prefix the serialized message with its length"""
+        tag, body = message.encode()
+        return b"".join((_FRAME_HEADER.pack(len(tag) + len(body)), tag, body))
+    
     def disconnect(self):
         """Disconnect from server"""
         self.connected = False
@@ -4,16 +4,29 @@ import json
 import base64
 import logging
 import asyncio
-from typing import Optional, Dict
-import anthropic
-import openai
-from PIL import Image
+import mmap
+import importlib.util
+from typing import AsyncIterator, Optional, Dict, Tuple
+import httpx
 
 logger = logging.getLogger(__name__)
 
+# Kept constant across requests so providers can cache the prompt prefix
+SYSTEM_PROMPT = "You are a helpful AI assistant."
+
+def create_http_client() -> httpx.AsyncClient:
+    """Create a pooled HTTP client to share across LLM requests"""
+    return httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+        # HTTP/2 needs the optional h2 package
+        http2=importlib.util.find_spec("h2") is not None,
+        timeout=120
+    )
+
 class LLMClient:
-    def __init__(self, llm_config: Dict):
+    def __init__(self, llm_config: Dict, http_client: Optional[httpx.AsyncClient] = None):
         self.config = self._validate_config(llm_config)
+        self.http_client = http_client
         self.client = None
         self._initialize_client()
 
@@ -52,10 +65,16 @@ class LLMClient:
             return
             
         try:
+            # Import only the SDK for the configured provider; each one is
+            # slow to import and the other is never used
             if self.config['provider'] == 'anthropic':
-                self.client = anthropic.AsyncAnthropic(api_key=self.config['api_key'])
+                import anthropic
+                self.client = anthropic.AsyncAnthropic(api_key=self.config['api_key'],
+                                                       http_client=self.http_client)
             elif self.config['provider'] == 'openai':
-                self.client = openai.AsyncOpenAI(api_key=self.config['api_key'])
+                import openai
+                self.client = openai.AsyncOpenAI(api_key=self.config['api_key'],
+                                                 http_client=self.http_client)
             else:
                 logger.error(f"Unsupported provider: {self.config['provider']}")
         except Exception as e:
@@ -64,8 +83,11 @@ class LLMClient:
     def _encode_image(self, image_path: str) -> str:
         """Encode image to base64"""
         try:
-            with open(image_path, 'rb') as image_file:
-                return base64.b64encode(image_file.read()).decode('utf-8')
+            # Encode straight from a read-only mapping instead of reading the
+            # whole screenshot into an intermediate bytes object
+            with open(image_path, 'rb') as image_file, \
+                    mmap.mmap(image_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return base64.b64encode(mapped).decode('utf-8')
         except Exception as e:
             logger.error(f"Failed to encode image: {e}")
             raise
@@ -81,15 +103,15 @@ class LLMClient:
         }
         return mime_types.get(ext, 'image/png')
     
-    async def send_screenshot(self, image_path: str, context_prompt: str) -> str:
+    async def send_screenshot(self, image_path: str, context_prompt: str,
+                              image_bytes: Optional[bytes] = None,
+                              mime_type: Optional[str] = None) -> str:
         """Send screenshot to LLM and get response"""
         if not self.client:
             raise Exception("LLM client not initialized")
         
         try:
-            # Encode image
-            image_data = self._encode_image(image_path)
-            mime_type = self._get_image_mime_type(image_path)
+            image_data, mime_type = await self._prepare_image_async(image_path, image_bytes, mime_type)
             
             if self.config['provider'] == 'anthropic':
                 return await self._send_anthropic(image_data, mime_type, context_prompt)
@@ -102,6 +124,66 @@ class LLMClient:
             logger.error(f"Failed to send screenshot to LLM: {e}")
             raise
     
+    async def stream_screenshot(self, image_path: str, context_prompt: str,
+                                image_bytes: Optional[bytes] = None,
+                                mime_type: Optional[str] = None) -> AsyncIterator[str]:
+        """Send screenshot to LLM and yield the response text as it arrives"""
+        if not self.client:
+            raise Exception("LLM client not initialized")
+        
+        try:
+            image_data, mime_type = await self._prepare_image_async(image_path, image_bytes, mime_type)
+            
+            if self.config['provider'] == 'anthropic':
+                message = self._anthropic_screenshot_message(image_data, mime_type, context_prompt)
+                async with self.client.messages.stream(
+                    model=self.config['model'],
+                    max_tokens=self.config['max_tokens'],
+                    messages=[message]
+                ) as stream:
+                    async for text in stream.text_stream:
+                        yield text
+            elif self.config['provider'] == 'openai':
+                message = self._openai_screenshot_message(image_data, mime_type, context_prompt)
+                stream = await self.client.chat.completions.create(
+                    model=self.config['model'],
+                    max_tokens=self.config['max_tokens'],
+                    messages=[message],
+                    stream=True
+                )
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+            else:
+                raise Exception(f"Unsupported provider: {self.config['provider']}")
+                
+        except Exception as e:
+            logger.error(f"Failed to stream screenshot response from LLM: {e}")
+            raise
+    
+    async def _prepare_image_async(self, image_path: str, image_bytes: Optional[bytes] = None,
+                                   mime_type: Optional[str] = None) -> Tuple[str, str]:
+        """Run _prepare_image in the default executor"""
+        # Encoding a full screenshot takes milliseconds; keep it off the
+        # event loop, which also serves IPC and other requests
+        return await asyncio.get_event_loop().run_in_executor(
+            None, self._prepare_image, image_path, image_bytes, mime_type
+        )
+    
+    def _prepare_image(self, image_path: str, image_bytes: Optional[bytes] = None,
+                       mime_type: Optional[str] = None) -> Tuple[str, str]:
+        """Base64-encode the screenshot and work out its MIME type.
+        
+        If the caller already holds the image bytes they are encoded directly
+        and image_path is only used to determine the MIME type, unless
+        mime_type is given (e.g. the bytes were re-encoded).
+        """
+        if image_bytes is not None:
+            image_data = base64.b64encode(image_bytes).decode('utf-8')
+        else:
+            image_data = self._encode_image(image_path)
+        return image_data, mime_type or self._get_image_mime_type(image_path)
+    
     async def send_conversation(self, messages: list, context_prompt: str = "") -> str:
         """Send conversation with context to LLM"""
         if not self.client:
@@ -121,7 +203,19 @@ class LLMClient:
     
     async def _send_anthropic(self, image_data: str, mime_type: str, context_prompt: str) -> str:
         """Send to Anthropic Claude"""
-        message = {
+        message = self._anthropic_screenshot_message(image_data, mime_type, context_prompt)
+        
+        response = await self.client.messages.create(
+            model=self.config['model'],
+            max_tokens=self.config['max_tokens'],
+            messages=[message]
+        )
+        
+        return response.content[0].text
+    
+    def _anthropic_screenshot_message(self, image_data: str, mime_type: str, context_prompt: str) -> Dict:
+        """Build the Anthropic user message for a screenshot"""
+        return {
             "role": "user",
             "content": [
                 {
@@ -138,18 +232,22 @@ class LLMClient:
                 }
             ]
         }
+    
+    async def _send_openai(self, image_data: str, mime_type: str, context_prompt: str) -> str:
+        """Send to OpenAI"""
+        message = self._openai_screenshot_message(image_data, mime_type, context_prompt)
         
-        response = await self.client.messages.create(
+        response = await self.client.chat.completions.create(
             model=self.config['model'],
             max_tokens=self.config['max_tokens'],
             messages=[message]
         )
         
-        return response.content[0].text
+        return response.choices[0].message.content
     
-    async def _send_openai(self, image_data: str, mime_type: str, context_prompt: str) -> str:
-        """Send to OpenAI"""
-        message = {
+    def _openai_screenshot_message(self, image_data: str, mime_type: str, context_prompt: str) -> Dict:
+        """Build the OpenAI user message for a screenshot"""
+        return {
             "role": "user",
             "content": [
                 {
@@ -164,14 +262,6 @@ class LLMClient:
                 }
             ]
         }
-        
-        response = await self.client.chat.completions.create(
-            model=self.config['model'],
-            max_tokens=self.config['max_tokens'],
-            messages=[message]
-        )
-        
-        return response.choices[0].message.content
     
     def update_api_key(self, api_key: str):
         """Update API key in config"""
@@ -210,25 +300,44 @@ class LLMClient:
             
             content = msg.get("content", "")
             if isinstance(content, list):
-                # Handle multipart content (text + images)
-                formatted_messages.append({
-                    "role": msg["role"],
-                    "content": content
-                })
-            else:
-                # Simple text content
-                formatted_messages.append({
-                    "role": msg["role"],
-                    "content": content
-                })
+                # Build the API form of multipart content in one pass; only
+                # image_path parts need converting, everything else passes through
+                formatted_content = []
+                for part in content:
+                    if part.get("type") != "image_path":
+                        formatted_content.append(part)
+                        continue
+                    try:
+                        image_data = await asyncio.get_event_loop().run_in_executor(
+                            None, self._encode_image, part["image_path"]
+                        )
+                    except Exception as e:
+                        logger.error(f"Failed to process image: {e}")
+                        # Skip the image part if processing fails
+                        continue
+                    formatted_content.append({
+                        "type": "image",
+                        "source": {
+                            "type": "base64",
+                            "media_type": self._get_image_mime_type(part["image_path"]),
+                            "data": image_data
+                        }
+                    })
+                content = formatted_content
+            
+            formatted_messages.append({
+                "role": msg["role"],
+                "content": content
+            })
         
-        # Add system prompt if provided
-        system_prompt = context_prompt if context_prompt else "You are a helpful AI assistant."
+        # Per-request context rides in the latest user turn so the system
+        # prompt and earlier turns stay byte-identical for prompt caching
+        self._add_context_to_last_turn(formatted_messages, context_prompt)
         
         response = await self.client.messages.create(
             model=self.config['model'],
             max_tokens=self.config['max_tokens'],
-            system=system_prompt,
+            system=SYSTEM_PROMPT,
             messages=formatted_messages
         )
         
@@ -239,12 +348,11 @@ class LLMClient:
         # Format messages for OpenAI
         formatted_messages = []
         
-        # Add system message if provided
-        if context_prompt:
-            formatted_messages.append({
-                "role": "system",
-                "content": context_prompt
-            })
+        # Static system message keeps the request prefix cacheable
+        formatted_messages.append({
+            "role": "system",
+            "content": SYSTEM_PROMPT
+        })
         
         for msg in messages:
             content = msg.get("content", "")
@@ -262,7 +370,9 @@ class LLMClient:
                     elif part.get("type") == "image_path":
                         # Convert image_path to base64 for OpenAI
                         try:
-                            image_data = self._encode_image(part["image_path"])
+                            image_data = await asyncio.get_event_loop().run_in_executor(
+                                None, self._encode_image, part["image_path"]
+                            )
                             mime_type = self._get_image_mime_type(part["image_path"])
                             formatted_content.append({
                                 "type": "image_url",
@@ -286,6 +396,9 @@ class LLMClient:
                     "content": content
                 })
         
+        # Per-request context joins the latest user turn (see _add_context_to_last_turn)
+        self._add_context_to_last_turn(formatted_messages, context_prompt)
+        
         response = await self.client.chat.completions.create(
             model=self.config['model'],
             max_tokens=self.config['max_tokens'],
@@ -293,6 +406,23 @@ class LLMClient:
         )
         
         return response.choices[0].message.content
+    
+    def _add_context_to_last_turn(self, formatted_messages: list, context_prompt: str):
+        """Put the dynamic context prompt ahead of the latest user message"""
+        if not context_prompt:
+            return
+        
+        if formatted_messages and formatted_messages[-1]["role"] == "user":
+            last = formatted_messages[-1]
+            if isinstance(last["content"], list):
+                last["content"] = [{"type": "text", "text": context_prompt}] + last["content"]
+            else:
+                last["content"] = f"{context_prompt}\n\n{last['content']}"
+        else:
+            formatted_messages.append({
+                "role": "user",
+                "content": context_prompt
+            })
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
@@ -18,6 +18,17 @@ from typing import Optional
 import subprocess
 import re
 
+# Line prefixes, grouped so each check is a single startswith(tuple) call
+_SUMMARY_PREFIXES = ('summary:', 'tl;dr:', 'in short:', 'quick answer:')
+_MARKUP_PREFIXES = ('#', '```', '-', '*')
+_COMMENT_PREFIXES = ('#', '//')
+_COMMAND_PREFIXES = ('sudo', 'apt', 'pip', 'npm', 'git', 'cd', 'mkdir', 'cp', 'mv', 'chmod')
+_SHELL_LANGUAGES = frozenset(('bash', 'sh', 'shell', ''))
+
+# A fenced code block: language on the opening line, body up to the closing
+# fence (or end of text if the block is never closed)
+_FENCE_RE = re.compile(r'^[ \t]*```([^\n]*)\n(.*?)(?:^[ \t]*```|\Z)', re.MULTILINE | re.DOTALL)
+
 class QuickAnswerWindow(Gtk.Window):
     """
     A modern GTK pop-up window for displaying quick LLM responses.
@@ -242,13 +253,13 @@ class QuickAnswerWindow(Gtk.Window):
         # Look for explicit summary patterns
         for line in lines:
             line = line.strip()
-            if line.lower().startswith(('summary:', 'tl;dr:', 'in short:', 'quick answer:')):
+            if line.lower().startswith(_SUMMARY_PREFIXES):
                 return line.split(':', 1)[1].strip()
         
         # Extract first meaningful sentence
         for line in lines:
             line = line.strip()
-            if line and not line.startswith(('#', '```', '-', '*')) and len(line) > 20:
+            if len(line) > 20 and not line.startswith(_MARKUP_PREFIXES):
                 # Take first sentence or first 100 chars
                 if '.' in line:
                     return line.split('.')[0] + '.'
@@ -262,28 +273,19 @@ class QuickAnswerWindow(Gtk.Window):
     def _extract_commands(self) -> list:
         """Extract executable commands from the response"""
         commands = []
-        lines = self.response_text.split('\n')
-        in_code_block = False
-        current_language = ""
         
-        for line in lines:
-            line = line.strip()
-            
-            if line.startswith('```'):
-                if in_code_block:
-                    in_code_block = False
-                    current_language = ""
-                else:
-                    in_code_block = True
-                    current_language = line[3:].strip()
-                continue
+        # Only fenced blocks can hold commands, so prose is never scanned
+        for block in _FENCE_RE.finditer(self.response_text):
+            current_language = block.group(1).strip()
             
-            if in_code_block:
+            for line in block.group(2).split('\n'):
+                line = line.strip()
+                
                 # Skip empty lines and comments
-                if line and not line.startswith('#') and not line.startswith('//'):
+                if line and not line.startswith(_COMMENT_PREFIXES):
                     # Check if it looks like a command
-                    if (current_language in ['bash', 'sh', 'shell', ''] and 
-                        (line.startswith(('sudo', 'apt', 'pip', 'npm', 'git', 'cd', 'mkdir', 'cp', 'mv', 'chmod')) or
+                    if (current_language in _SHELL_LANGUAGES and 
+                        (line.startswith(_COMMAND_PREFIXES) or
                          ' install ' in line or ' run ' in line or ' start ' in line)):
                         commands.append(line)
                     elif current_language == 'python' and ('import' in line or line.startswith('python')):
@@ -429,10 +431,7 @@ class QuickAnswerWindow(Gtk.Window):
                     print(f"Failed to send message to chat: {e}")
             
             # Run async function
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            loop.run_until_complete(send_message())
-            loop.close()
+            asyncio.run(send_message())
             
             # Close the pop-up
             Gtk.main_quit()
@@ -7,6 +7,10 @@ from typing import List
 
 logger = logging.getLogger(__name__)
 
+# Command extraction patterns, compiled once at import
+_CODE_BLOCK_RE = re.compile(r'```(\w+)?\n(.*?)\n```', re.DOTALL)
+_INLINE_CODE_RE = re.compile(r'`([^`]+)`')
+
 class SimpleCommandInterface:
     """Simple text-based interface for testing without GTK"""
     
@@ -18,8 +22,7 @@ class SimpleCommandInterface:
         commands = []
         
         # Find code blocks
-        code_block_pattern = r'```(\w+)?\n(.*?)\n```'
-        matches = re.findall(code_block_pattern, llm_response, re.DOTALL)
+        matches = _CODE_BLOCK_RE.findall(llm_response)
         
         for lang, code in matches:
             if not lang:
@@ -32,8 +35,7 @@ class SimpleCommandInterface:
             })
         
         # Find inline code
-        inline_pattern = r'`([^`]+)`'
-        inline_matches = re.findall(inline_pattern, llm_response)
+        inline_matches = _INLINE_CODE_RE.findall(llm_response)
         
         for code in inline_matches:
             if len(code.split()) <= 5 and any(cmd in code for cmd in ['cd', 'ls', 'git', 'npm', 'python']):
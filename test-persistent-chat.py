@@ -5,8 +5,11 @@ Test script for persistent chat functionality
 
 import os
 import sys
+import json
 import time
 import asyncio
+import tempfile
+import threading
 from pathlib import Path
 
 # Add lib directory to path
@@ -54,6 +57,44 @@ def test_conversation_manager():
     print("ConversationManager test completed ✓\n")
     return True
 
+def test_auto_save_interleaving():
+    """Test that clearing waits for an auto-save that is already running"""
+    print("Testing auto-save vs. clear interleaving...")
+    
+    claimed = threading.Event()
+    release = threading.Event()
+    
+    class PausingManager(ConversationManager):
+        def save_conversation(self, conversation_id=None):
+            # Pause after the timer is claimed, before the snapshot
+            claimed.set()
+            release.wait(5)
+            return super().save_conversation(conversation_id)
+    
+    with tempfile.TemporaryDirectory() as config_dir:
+        conv = PausingManager(config_dir=config_dir)
+        conv_id = conv.create_new_conversation()
+        conv.add_user_message("Keep me")
+        
+        # Auto-save timer fires and claims the pending save
+        assert claimed.wait(5), "auto-save never fired"
+        
+        clearer = threading.Thread(target=conv.clear_conversation)
+        clearer.start()
+        time.sleep(0.2)
+        assert clearer.is_alive(), "clear_conversation didn't wait for the save in progress"
+        
+        release.set()
+        clearer.join(5)
+        
+        with open(os.path.join(conv.conversations_dir, f"{conv_id}.json")) as f:
+            saved = json.load(f)
+        assert [m["content"] for m in saved["messages"]] == ["Keep me"]
+        assert len(os.listdir(conv.conversations_dir)) == 1, "an empty conversation was written"
+    
+    print("Auto-save interleaving test completed ✓\n")
+    return True
+
 async def test_ipc():
     """Test IPC functionality"""
     print("Testing IPC...")
@@ -112,6 +153,7 @@ def main():
     tests = [
         test_file_structure,
         test_conversation_manager,
+        test_auto_save_interleaving,
         lambda: asyncio.run(test_ipc())
     ]
     